@@ -1,23 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import networkx as nx
-import time
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 src_path = os.path.join(current_dir, "src")
 if src_path not in sys.path:
     sys.path.append(src_path)
 
-from algorithms.ga import GenetikAlgorithm
 # Kendi yazdığımız modüller
 from network_generator import NetworkManager
-from metrics import calculate_path_attributes, calculate_weighted_cost
-from algorithms.q_learning import QLearningRouter
-from algorithms.aco_optimizer import ACORouter
+from solver import solve_demand, solve_demand_in_worker, init_worker
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 class NetworkApp:
@@ -30,8 +28,19 @@ class NetworkApp:
         self.nm = NetworkManager()
         self.graph = None
         self.demands = None
+        self.index = None
 
         self.pos = None
+        # Her talepte yalnızca kırmızı yol katmanı yeniden çizilir
+        self._path_artists = []
+
+        # Aynı talep + ağırlıklar için ACO / Q-Learning sonuç önbelleği
+        # Anahtar: (algoritma, src, dst, bw, w_delay, w_rel, w_bw) -> metrikler
+        self._aco_cache = {}
+        # "Tüm Talepler" modunda çizilecek en iyi (en düşük maliyetli) sonuç
+        self._best_metrics = None
+        # Süren paralel hesaplamanın süreç havuzu (aynı anda yalnızca bir tane)
+        self._executor = None
 
         # ================== ANA PANEL ==================
         main_pane = tk.PanedWindow(
@@ -145,11 +154,12 @@ class NetworkApp:
         self.demand_combo = ttk.Combobox(demand_frame, state="readonly", width=40)
         self.demand_combo.grid(row=6, column=0, columnspan=2)
 
-        tk.Button(
+        self.calc_button = tk.Button(
             left_frame, text="HESAPLA VE GÖSTER",
             bg="#4CAF50", fg="white",
             command=self.calculate_score
-        ).pack(pady=20)
+        )
+        self.calc_button.pack(pady=20)
 
         # ================== SAĞ TARAF ==================
         tk.Label(
@@ -180,13 +190,24 @@ class NetworkApp:
             "data/BSM307_317_Guz2025_TermProject_EdgeData.csv",
             "data/BSM307_317_Guz2025_TermProject_DemandData.csv"
         )
+        self.index = self.nm.index
+
+        # Yerleşim ve arka plan (tüm node/link'ler) graf başına bir kez hesaplanır
+        self.pos = nx.spring_layout(self.graph, seed=42, k=0.6, iterations=50)
+        self.draw_background(self.graph)
         self.status_label.config(
             text=f"Yüklendi | Node: {len(self.graph.nodes)} | Talep: {len(self.demands)}",
             fg="green"
         )
+        # Ağ değişti, eski sonuçlar geçersiz
+        self._aco_cache = {}
 
     # --------------------------------------------------
     def calculate_score(self):
+        # Paralel hesaplama sürerken yeni bir hesaplama başlatılmaz
+        if self._executor is not None:
+            return
+
         self.result_text.delete(1.0, tk.END)
 
         weights = {
@@ -208,133 +229,155 @@ class NetworkApp:
         else:
             demands = self.demands
 
+        algo = self.algo_var.get()
+
+        if self.demand_mode.get() == "all":
+            self.solve_all_parallel(algo, weights, demands)
+            return
+
+        # Metin tek seferde eklenir, graf yalnızca en iyi yol için bir kez çizilir
+        chunks = []
+        best = None
         for d in demands:
-            self.root.update()
-            start_time = time.time()
-
-            # --- Q-LEARNING ---
-            if self.algo_var.get() == "Q-Learning":
-                best_metrics = None
-                best_cost = float("inf")
-
-                for _ in range(5):
-                    router = QLearningRouter(self.graph, weights)
-                    router.train(d["src"], d["dst"], d["bandwidth_needed"])
-                    path = router.get_best_path(d["src"], d["dst"])
-                    metrics = router.get_path_metrics(path, d["bandwidth_needed"])
-
-                    if metrics and metrics.get("valid", False):
-                        if metrics["total_cost"] < best_cost:
-                            best_cost = metrics["total_cost"]
-                            best_metrics = metrics
-                metrics = best_metrics
-
-            # --- ACO (Ant Colony Optimization) ---
-            elif self.algo_var.get() == "ACO":
-                best_metrics = None
-                best_cost = float("inf")
-
-                for _ in range(5):
-                    router = ACORouter(self.graph, weights, ant_count=20, iterations=20)
-                    router.train(d["src"], d["dst"], d["bandwidth_needed"])
-                    path = router.get_best_path(d["src"], d["dst"])
-                    if path and len(path) > 1:
-                        metrics = router.get_path_metrics(path, d["bandwidth_needed"])
-
-                        if metrics and metrics.get("valid", False):
-                            if metrics["total_cost"] < best_cost:
-                                best_cost = metrics["total_cost"]
-                                best_metrics = metrics
-
-                metrics = best_metrics
-
-            # --- GENETİK ---
-            elif self.algo_var.get() == "Genetik":
-                best_metrics = None
-                best_cost = float("inf")
-
-                ga = GenetikAlgorithm()
-                for _ in range(1):
-                    path = ga.genetik_calistir(self.graph, d["src"], d["dst"], d["bandwidth_needed"], weights)
-                    if path and len(path) > 1:
-                        metrics = ga.get_path_metrics(path, d["bandwidth_needed"])
-
-                        if metrics and metrics.get("valid", False):
-                            if metrics["total_cost"] < best_cost:
-                                best_cost = metrics["total_cost"]
-                                best_metrics = metrics
-
-                metrics = best_metrics
-
-            # --- DIJKSTRA ---
+            cache_key = self.cache_key(algo, d, weights)
+
+            # --- ÖNBELLEK (Aynı talep daha önce çözüldüyse) ---
+            if cache_key in self._aco_cache:
+                metrics, runtime = self._aco_cache[cache_key], 0.0
             else:
-                try:
-                    # Dijkstra по умолчанию ищет кратчайший путь (по весу 1, т.е. хопам)
-                    path = nx.shortest_path(self.graph, d["src"], d["dst"])
-                    metrics = self.calculate_metrics_manual(path, weights)
-                except nx.NetworkXNoPath:
-                    metrics = None
-
-            runtime = time.time() - start_time
-
-            if metrics and metrics.get("valid", False):
-                self.result_text.insert(
-                    tk.END,
-                    f"🧠 Algoritma: {self.algo_var.get()}\n"
-                    f"📌 Talep: {d['src']} → {d['dst']}\n"
-                    f"{'-' * 70}\n"
-                    f"🛣️  Seçilen Yol:\n   {metrics['path']}\n\n"
-                    f"📊 Performans Metrikleri:\n"
-                    f"   • Toplam Gecikme: {metrics['total_delay']:.2f}\n"
-                    f"   • Toplam Güvenilirlik: {metrics['total_reliability']:.6f}\n"
-                    f"   • Kaynak Maliyeti: {metrics['resource_cost']:.4f}\n"
-                    f"   • Toplam Maliyet: {metrics['total_cost']:.4f}\n"
-                    f"   • Darboğaz Bant Genişliği: {metrics['bottleneck_bw']} Mbps\n\n"
-                    f"⏱️  Çalışma Süresi: {runtime:.4f} saniye\n"
-                    f"{'=' * 80}\n\n"
-                )
-                self.draw_graph_with_path(self.graph, metrics["path"])
+                result = solve_demand(self.graph, self.index, d, weights, algo)
+                metrics, runtime = self.store_result(algo, weights, result), result["runtime"]
+
+            chunks.append(self.format_result(algo, d, metrics, runtime))
+            best = self.pick_best(best, metrics)
 
+        self.result_text.insert(tk.END, "".join(chunks))
+        if best:
+            self.draw_graph_with_path(self.graph, best["path"])
+
+    # --------------------------------------------------
+    def solve_all_parallel(self, algo, weights, demands):
+        """
+        Talepler birbirinden bağımsızdır: her biri ayrı bir süreçte çözülür.
+        Sonuçlar tamamlandıkça Tk ana döngüsünden (after) ekrana basılır.
+        Hesaplama bitene kadar buton devre dışıdır.
+        """
+        executor = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=init_worker,
+            initargs=(self.graph,)
+        )
+        self._executor = executor
+        self.calc_button.config(state=tk.DISABLED)
+        futures = {}
+        chunks = []
+        self._best_metrics = None
+        for d in demands:
+            cache_key = self.cache_key(algo, d, weights)
+            if cache_key in self._aco_cache:
+                metrics = self._aco_cache[cache_key]
+                chunks.append(self.format_result(algo, d, metrics, 0.0))
+                self._best_metrics = self.pick_best(self._best_metrics, metrics)
             else:
-                self.result_text.insert(
-                    tk.END,
-                    f"🧠 Algoritma: {self.algo_var.get()}\n"
+                futures[executor.submit(solve_demand_in_worker, d, weights, algo)] = d
+
+        if chunks:
+            self.result_text.insert(tk.END, "".join(chunks))
+
+        self.status_label.config(text=f"Hesaplanıyor... 0/{len(futures)}", fg="blue")
+        self.root.after(50, self.poll_futures, executor, futures, algo, weights, len(futures))
+
+    def poll_futures(self, executor, futures, algo, weights, total):
+        # Bu tikte biten sonuçlar tek bir metin eklemesiyle basılır
+        chunks = []
+        for fut in [f for f in futures if f.done()]:
+            d = futures.pop(fut)
+            try:
+                result = fut.result()
+            except Exception as e:
+                chunks.append(
+                    f"🧠 Algoritma: {algo}\n"
                     f"📌 Talep: {d['src']} → {d['dst']}\n"
-                    f"❌ Yol bulunamadı (veya kısıtlar sağlanmadı)\n"
+                    f"❌ Hata: {e}\n"
                     f"{'=' * 80}\n\n"
                 )
+                continue
+            metrics = self.store_result(algo, weights, result)
+            chunks.append(self.format_result(algo, result["demand"], metrics, result["runtime"]))
+            self._best_metrics = self.pick_best(self._best_metrics, metrics)
+
+        if chunks:
+            self.result_text.insert(tk.END, "".join(chunks))
+
+        self.status_label.config(
+            text=f"Hesaplanıyor... {total - len(futures)}/{total}", fg="blue"
+        )
+
+        if futures:
+            self.root.after(50, self.poll_futures, executor, futures, algo, weights, total)
+        else:
+            executor.shutdown(wait=False)
+            self._executor = None
+            self.calc_button.config(state=tk.NORMAL)
+            if self._best_metrics:
+                self.draw_graph_with_path(self.graph, self._best_metrics["path"])
+            self.status_label.config(text=f"Tamamlandı | Talep: {total}", fg="green")
 
     # --------------------------------------------------
-    def calculate_metrics_manual(self, path, weights):
-        attrs = calculate_path_attributes(self.graph, path)
-        cost = calculate_weighted_cost(attrs, weights)
-
-        total_reliability = 1.0
-        for i in range(len(path) - 1):
-            total_reliability *= self.graph.edges[path[i], path[i + 1]]['reliability']
-        for n in path:
-            total_reliability *= self.graph.nodes[n]['reliability']
-
-        min_bw = min(
-            self.graph.edges[path[i], path[i + 1]]['bandwidth']
-            for i in range(len(path) - 1)
+    def cache_key(self, algo, d, weights):
+        return (
+            algo, d["src"], d["dst"], d["bandwidth_needed"],
+            round(weights["w_delay"], 2),
+            round(weights["w_reliability"], 2),
+            round(weights["w_resource"], 2)
         )
 
-        return {
-            "valid": True,
-            "path": path,
-            "total_delay": attrs["total_delay"],
-            "total_reliability": total_reliability,
-            "resource_cost": attrs["resource_cost"],
-            "total_cost": cost,
-            "bottleneck_bw": min_bw
-        }
+    def store_result(self, algo, weights, result):
+        d = result["demand"]
+        metrics = result["metrics"]
+
+        if algo in ("Q-Learning", "ACO") and metrics and metrics.get("valid", False):
+            self._aco_cache[self.cache_key(algo, d, weights)] = metrics
+
+        return metrics
+
+    def pick_best(self, best, metrics):
+        """Geçerli sonuçlar arasından toplam maliyeti en düşük olanı tutar."""
+        if not metrics or not metrics.get("valid", False):
+            return best
+        if best is None or metrics["total_cost"] < best["total_cost"]:
+            return metrics
+        return best
+
+    def format_result(self, algo, d, metrics, runtime):
+        if metrics and metrics.get("valid", False):
+            return (
+                f"🧠 Algoritma: {algo}\n"
+                f"📌 Talep: {d['src']} → {d['dst']}\n"
+                f"{'-' * 70}\n"
+                f"🛣️  Seçilen Yol:\n   {metrics['path']}\n\n"
+                f"📊 Performans Metrikleri:\n"
+                f"   • Toplam Gecikme: {metrics['total_delay']:.2f}\n"
+                f"   • Toplam Güvenilirlik: {metrics['total_reliability']:.6f}\n"
+                f"   • Kaynak Maliyeti: {metrics['resource_cost']:.4f}\n"
+                f"   • Toplam Maliyet: {metrics['total_cost']:.4f}\n"
+                f"   • Darboğaz Bant Genişliği: {metrics['bottleneck_bw']:g} Mbps\n\n"
+                f"⏱️  Çalışma Süresi: {runtime:.4f} saniye\n"
+                f"{'=' * 80}\n\n"
+            )
 
-    def draw_graph_with_path(self, graph, path=None):
-        self.ax.clear()
+        return (
+            f"🧠 Algoritma: {algo}\n"
+            f"📌 Talep: {d['src']} → {d['dst']}\n"
+            f"❌ Yol bulunamadı (veya kısıtlar sağlanmadı)\n"
+            f"{'=' * 80}\n\n"
+        )
 
-        if self.pos is None:
-            self.pos = nx.spring_layout(graph, seed=42, k=0.6, iterations=50)
+    # --------------------------------------------------
+    def draw_background(self, graph):
+        """Tüm node ve linkleri bir kez çizer; sonraki çizimlerde korunur."""
+        self.ax.clear()
+        self._path_artists = []
 
         pos = self.pos
 
@@ -359,6 +402,22 @@ class NetworkApp:
             ax=self.ax
         )
 
+        self.ax.set_title("Ağ Grafiği (En İyi Yol Kırmızı)")
+        self.ax.axis("off")
+        self.canvas.draw()
+
+    def draw_graph_with_path(self, graph, path=None):
+        if self.pos is None:
+            self.pos = nx.spring_layout(graph, seed=42, k=0.6, iterations=50)
+            self.draw_background(graph)
+
+        pos = self.pos
+
+        # Önceki yolun katmanını kaldır (arka plan olduğu gibi kalır)
+        for artist in self._path_artists:
+            artist.remove()
+        self._path_artists = []
+
         # En iyi yol (KIRMIZI)
         if path and len(path) > 1:
             source = path[0]
@@ -368,7 +427,7 @@ class NetworkApp:
             path_edges = list(zip(path[:-1], path[1:]))
 
             # Orta yol node'ları (kırmızı)
-            nx.draw_networkx_nodes(
+            middle = nx.draw_networkx_nodes(
                 graph, pos,
                 nodelist=middle_nodes,
                 node_color="red",
@@ -377,7 +436,7 @@ class NetworkApp:
             )
 
             # Source (yeşil)
-            nx.draw_networkx_nodes(
+            src_nodes = nx.draw_networkx_nodes(
                 graph, pos,
                 nodelist=[source],
                 node_color="green",
@@ -386,7 +445,7 @@ class NetworkApp:
             )
 
             # Destination (mor)
-            nx.draw_networkx_nodes(
+            dst_nodes = nx.draw_networkx_nodes(
                 graph, pos,
                 nodelist=[destination],
                 node_color="purple",
@@ -395,15 +454,16 @@ class NetworkApp:
             )
 
             # Yol kenarları (kırmızı)
-            nx.draw_networkx_edges(
-                graph, pos,
-                edgelist=path_edges,
-                width=3,
-                edge_color="red",
-                ax=self.ax
+            edges = LineCollection(
+                [(pos[u], pos[v]) for u, v in path_edges],
+                colors="red",
+                linewidths=3,
+                zorder=1
             )
+            self.ax.add_collection(edges)
+
             # Label (S ve D)
-            nx.draw_networkx_labels(
+            labels = nx.draw_networkx_labels(
                 graph,
                 pos,
                 labels={
@@ -415,8 +475,11 @@ class NetworkApp:
                 ax=self.ax
             )
 
-        self.ax.set_title("Ağ Grafiği (En İyi Yol Kırmızı)")
-        self.ax.axis("off")
+            for artist in [middle, src_nodes, dst_nodes, edges, *labels.values()]:
+                # Boş nodelist için networkx eksene eklenmemiş bir nesne döndürür
+                if artist is not None and artist.axes is not None:
+                    self._path_artists.append(artist)
+
         self.canvas.draw()
 
     def on_zoom(self, event):
@@ -0,0 +1,8 @@
+from .numba_compat import NUMBA_AVAILABLE
+
+# Q-Learning çekirdeğini paket yüklenirken hazırla (ilk deney derleme beklemesin).
+# Göreli importlar: paket hangi adla yüklenirse (src.algorithms veya GUI'deki
+# algorithms) çağıranın kullandığı modül ısıtılır ve ısıtma bir kez yapılır.
+if NUMBA_AVAILABLE:
+    from .q_learning import warmup_kernels
+    warmup_kernels()
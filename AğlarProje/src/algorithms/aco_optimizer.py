@@ -1,10 +1,96 @@
-import random
 import math
+import numpy as np
 import networkx as nx
 from typing import List, Dict, Any, Optional
 
 # Metrik fonksiyonlarını içe aktar
-from src.metrics import calculate_path_attributes, calculate_weighted_cost
+from src.metrics import calculate_weighted_cost
+from src.graph_index import GraphIndex
+from .numba_compat import njit, NUMBA_AVAILABLE
+
+
+@njit(cache=True)
+def _construct_path_nb(indptr, indices, edge_ids, bw, log_eta_beta, log_pher, alpha,
+                       src, dst, demand_bw, visited_buf, path_buf, trail_buf,
+                       prob_buf, cand_buf, max_steps, max_backtracks):
+    """
+    Tek bir karıncanın yol inşasını CSR dizileri üzerinde yapan derlenmiş çekirdek.
+    Yol path_buf içine yazılır; dönüş değeri yol uzunluğudur (0 = başarısız).
+    Çıkmaz sokakta karınca ölmek yerine bir adım geri döner (en fazla max_backtracks kez).
+    visited_buf girişte tamamen False olmalıdır; çıkışta yalnızca bu karıncanın
+    işaretlediği düğümler (trail_buf) temizlenir, tüm dizi her seferinde sıfırlanmaz.
+    """
+    current = src
+    visited_buf[current] = True
+    path_buf[0] = current
+    trail_buf[0] = current
+    plen = 1
+    steps = 0
+    backtracks = 0
+    result = 0 # Hedefe ulaşamadı
+
+    while steps < max_steps:
+        if current == dst:
+            result = plen
+            break
+
+        # Geçerli komşuları ve logit'lerini topla:
+        # log(tau^alpha * eta^beta) = alpha*log(tau) + beta*log(eta)
+        # beta*log(eta) statiktir ve log_eta_beta olarak önceden hesaplanır
+        k = 0
+        max_logit = -np.inf
+        for j in range(indptr[current], indptr[current + 1]):
+            n = indices[j]
+            e = edge_ids[j]
+            if visited_buf[n] or bw[e] < demand_bw:
+                continue
+            logit = alpha * log_pher[e] + log_eta_beta[e]
+            if logit > max_logit:
+                max_logit = logit
+            prob_buf[k] = logit
+            cand_buf[k] = n
+            k += 1
+
+        if k == 0:
+            # Çıkmaz sokak: geri dön, düğüm ziyaretli kalır ve tekrar girilmez
+            if plen == 1 or backtracks >= max_backtracks:
+                break
+            backtracks += 1
+            plen -= 1
+            current = path_buf[plen - 1]
+            continue
+
+        # Rulet seçimi (kümülatif toplam + ikili arama).
+        # En büyük logit çıkarıldığı için en az bir terim exp(0) = 1'dir;
+        # toplam hiçbir zaman sıfıra düşmez (underflow yok).
+        total = 0.0
+        for i in range(k):
+            total += np.exp(prob_buf[i] - max_logit)
+            prob_buf[i] = total
+
+        r = np.random.random() * total
+        idx = np.searchsorted(prob_buf[:k], r, side='right')
+        if idx >= k:
+            idx = k - 1
+
+        current = cand_buf[idx]
+        visited_buf[current] = True
+        path_buf[plen] = current
+        plen += 1
+        steps += 1
+        trail_buf[steps] = current
+
+    # Geri dönülen çıkmaz düğümler dahil, işaretlenen her düğüm trail_buf'tadır
+    for i in range(steps + 1):
+        visited_buf[trail_buf[i]] = False
+    return result
+
+
+@njit(cache=True)
+def _seed_nb(seed):
+    """Derlenmiş çekirdeklerin kullandığı Numba RNG'sini tohumlar."""
+    np.random.seed(seed)
+
 
 class ACORouter:
     """
@@ -28,7 +114,9 @@ class ACORouter:
         alpha: float = 1.0,      # Feromonun önemi (Tarihçe)
         beta: float = 2.0,       # Sezgisel bilginin önemi (Maliyet/Uzaklık)
         evaporation: float = 0.5,# Buharlaşma oranı (Eski bilgiyi unutma hızı)
-        q: float = 100.0         # Bırakılacak feromon miktarı sabiti
+        q: float = 100.0,        # Bırakılacak feromon miktarı sabiti
+        seed: Optional[int] = None, # Tekrarlanabilirlik için rastgelelik tohumu
+        index: Optional[GraphIndex] = None # Paylaşılan graf dizileri (yoksa graftan kurulur)
     ):
         self.graph = graph
         self.weights = weights
@@ -38,23 +126,66 @@ class ACORouter:
         self.beta = beta
         self.evaporation = evaporation
         self.q = q
+
+        # Router'a ait rastgele sayı üreteci (global random yerine)
+        self._rng = np.random.default_rng(seed)
+        if seed is not None and NUMBA_AVAILABLE:
+            _seed_nb(seed)
         
-        self.nodes = list(graph.nodes())
+        # Graf türevli tüm diziler (CSR, bw, delay, rel...) salt okunurdur ve
+        # graf yüklenirken bir kez kurulan GraphIndex paylaşılır.
+        # Router'a özgü olan yalnızca feromon dizisidir.
+        self.index = index if index is not None else GraphIndex(graph)
+        self.nodes = self.index.nodes
+        self.node_index = self.index.node_index
         
         # En iyi sonuçları saklamak için
         self.best_path: Optional[List[int]] = None
         self.best_cost: float = float("inf")
 
-        # Feromon Haritası: {(u, v): feromon_miktarı}
+        # Kenar özellikleri (SoA) ve CSR komşuluk dizileri
+        self._build_edge_arrays()
+
+        # Feromon Dizisi: pher[edge_id] = feromon_miktarı
         # Başlangıçta tüm kenarlarda az miktarda feromon var
-        self.pheromones = {}
+        self.pher = None
         self._initialize_pheromones()
 
+    def _build_edge_arrays(self):
+        """
+        Kenar özellikleri (bw, delay, rel) ve CSR komşuluk dizileri
+        GraphIndex'ten alınır; yalnızca ACO'ya özgü diziler burada üretilir.
+        Böylece sıcak döngüde networkx sözlük erişimi yapılmaz.
+        """
+        index = self.index
+        self.bw = index.bw
+        self.delay = index.delay
+        self.rel = index.rel
+        self.indptr = index.indptr
+        self.indices = index.indices
+        self.edge_ids = index.edge_ids
+        self.max_deg = index.max_deg
+
+        # Sezgisel bilgi statiktir: log(eta) = -log(delay + 0.1)
+        self.log_eta = -np.log(self.delay + 0.1)
+
+        # Derlenmiş çekirdek için tekrar kullanılan tamponlar
+        n = index.n_nodes
+        # Adım sınırı: bu tür ağlarda yollar O(sqrt(N)) uzunluğunu nadiren aşar
+        self.max_steps = int(math.ceil(4 * math.sqrt(n)))
+        self.max_backtracks = n
+        self._visited_buf = np.zeros(n, dtype=np.bool_)
+        self._path_buf = np.empty(self.max_steps + 1, dtype=np.int32)
+        self._trail_buf = np.empty(self.max_steps + 1, dtype=np.int32)
+        # Toplu (NumPy) inşa için karınca başına ziyaret matrisi; bir kez ayrılır
+        self._batch_visited = np.zeros((self.ant_count, n), dtype=np.bool_)
+        self._prob_buf = np.empty(self.max_deg, dtype=np.float64)
+        self._cand_buf = np.empty(self.max_deg, dtype=np.int32)
+
     def _initialize_pheromones(self):
         """Tüm kenarlara başlangıç feromonu ekler."""
-        for u, v in self.graph.edges():
-            self.pheromones[(u, v)] = 1.0
-            self.pheromones[(v, u)] = 1.0 # Yönsüz graf olduğu için tersi de aynı
+        self.pher = np.ones(len(self.bw), dtype=np.float64)
+        self.log_pher = np.log(self.pher)
 
     # --------------------------------------------------
     # 1. EĞİTİM (Training) - Standart Yapı
@@ -69,25 +200,33 @@ class ACORouter:
         self.best_path = None
         self.best_cost = float("inf")
 
+        # Delay ve beta eğitim boyunca sabit: beta*log(eta) turda bir kez değil,
+        # eğitim başında bir kez hesaplanır; her turda yalnızca log(tau) yenilenir
+        self._log_eta_beta = self.beta * self.log_eta
+
         for _ in range(self.iterations):
-            all_paths = [] # Bu turda bulunan tüm geçerli yollar
+            # Bu turda bulunan geçerli yolların kenarları ve bırakacakları feromon
+            paths_eids = []
+            deposits = []
             
             # --- Karıncaları Gönder ---
-            for _ in range(self.ant_count):
-                path = self._construct_path(src, dst, demand_bw)
-                
-                if path:
+            for path_arr in self._construct_paths(src, dst, demand_bw):
+                if path_arr is not None:
                     # Yol maliyetini hesapla
-                    cost = self._calculate_path_cost(path)
-                    all_paths.append((path, cost))
+                    eids = self.index.edge_ids_of(path_arr)
+                    cost = self._calculate_path_cost(path_arr, eids)
+                    
+                    # Maliyet ne kadar düşükse, ödül o kadar büyük olsun
+                    paths_eids.append(eids)
+                    deposits.append(self.q / (cost + 0.0001))
                     
                     # Global en iyiyi güncelle
                     if cost < self.best_cost:
                         self.best_cost = cost
-                        self.best_path = path[:]
+                        self.best_path = self.index.node_labels(path_arr)
 
             # --- Feromon Güncelleme (Evaporation + Deposit) ---
-            self._update_pheromones(all_paths)
+            self._update_pheromones(paths_eids, deposits)
 
     # --------------------------------------------------
     # 2. EN İYİ YOL (Get Best Path)
@@ -103,25 +242,22 @@ class ACORouter:
         if not path or len(path) < 2:
             return {"valid": False, "error": "Yol bulunamadı"}
 
+        eids = self.index.path_edge_ids(path)
+        path_arr = self.index.path_array(path)
+
         # Darboğaz bant genişliği
-        min_bw = float('inf')
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i+1]
-            bw = self.graph.edges[u, v].get('bandwidth', 0)
-            if bw < min_bw: min_bw = bw
+        min_bw = float(self.bw[eids].min())
 
         if min_bw < demand_bw:
             return {"valid": False, "error": "Bant genişliği yetersiz"}
 
-        attrs = calculate_path_attributes(self.graph, path)
+        attrs = self.index.path_attributes(path_arr, eids)
         cost = calculate_weighted_cost(attrs, self.weights)
         
-        # Güvenilirlik hesabı
-        total_reliability = 1.0
-        for i in range(len(path) - 1):
-            total_reliability *= self.graph.edges[path[i], path[i+1]].get('reliability', 1.0)
-        for n in path:
-            total_reliability *= self.graph.nodes[n].get('reliability', 1.0)
+        # Güvenilirlik hesabı (kenar ve düğüm güvenilirliklerinin çarpımı)
+        total_reliability = float(
+            self.rel[eids].prod() * self.index.node_rel[path_arr].prod()
+        )
 
         return {
             "valid": True,
@@ -140,91 +276,134 @@ class ACORouter:
     def _construct_path(self, src, dst, demand_bw):
         """
         Bir karınca src'den başlar ve olasılıksal olarak dst'ye gitmeye çalışır.
+        Yol düğüm indeksi dizisi olarak döner (başarısızsa None).
+        Derlenmiş çekirdeği kullanır; yalnızca Numba kuruluyken çağrılır
+        (bkz. _construct_paths).
         """
-        current = src
-        path = [current]
-        visited = {current}
-        
-        # Sonsuz döngü koruması (maksimum adım sayısı)
-        for _ in range(len(self.nodes) * 2):
-            if current == dst:
-                return path
-            
-            neighbors = list(self.graph.neighbors(current))
-            
-            # 1. Filtreleme: Ziyaret edilmemiş VE Bant genişliği yeten komşular
-            valid_neighbors = []
-            for n in neighbors:
-                if n not in visited:
-                    bw = self.graph.edges[current, n].get('bandwidth', 0)
-                    if bw >= demand_bw:
-                        valid_neighbors.append(n)
-            
-            if not valid_neighbors:
-                return None # Çıkmaz sokak (Dead end), karınca öldü
-            
-            # 2. Olasılık Hesabı (Rulet Tekerleği)
-            probabilities = []
-            denominator = 0.0
-            
-            for n in valid_neighbors:
-                # Tau (Feromon): Geçmiş tecrübe
-                tau = self.pheromones.get((current, n), 1.0)
-                
-                # Eta (Sezgisel): Maliyetin tersi (Daha düşük gecikme = Daha yüksek çekicilik)
-                # Basitlik için sadece gecikmeyi kullanabiliriz veya 1.0 diyebiliriz.
-                # Burada kenarın 'delay' değerini kullanıyoruz.
-                edge_delay = self.graph.edges[current, n].get('delay', 1.0)
-                eta = 1.0 / (edge_delay + 0.1) # 0'a bölme hatası olmasın diye +0.1
-                
-                prob = (tau ** self.alpha) * (eta ** self.beta)
-                probabilities.append(prob)
-                denominator += prob
-            
-            if denominator == 0:
-                next_node = random.choice(valid_neighbors)
-            else:
-                # Rulet seçimi
-                probabilities = [p / denominator for p in probabilities]
-                next_node = random.choices(valid_neighbors, weights=probabilities, k=1)[0]
-            
-            current = next_node
-            path.append(current)
-            visited.add(current)
-            
-        return None # Hedefe ulaşamadı
+        plen = _construct_path_nb(
+            self.indptr, self.indices, self.edge_ids, self.bw, self._log_eta_beta,
+            self.log_pher, float(self.alpha),
+            self.node_index[src], self.node_index[dst], float(demand_bw),
+            self._visited_buf, self._path_buf, self._trail_buf,
+            self._prob_buf, self._cand_buf,
+            self.max_steps, self.max_backtracks
+        )
+        if plen == 0:
+            return None
+        return self._path_buf[:plen].astype(np.int64)
+
+    # --------------------------------------------------
+    # YARDIMCI: Bir Turdaki Tüm Karıncalar
+    # --------------------------------------------------
+    def _construct_paths(self, src, dst, demand_bw):
+        """
+        Bir turdaki ant_count karıncanın yollarını döndürür (başarısızlar None).
+        Numba varsa karıncalar derlenmiş çekirdekle tek tek,
+        yoksa hepsi birlikte vektörel olarak ilerletilir.
+        """
+        if NUMBA_AVAILABLE:
+            return [self._construct_path(src, dst, demand_bw) for _ in range(self.ant_count)]
+        return self._construct_paths_batch(src, dst, demand_bw)
+
+    def _construct_paths_batch(self, src, dst, demand_bw):
+        """
+        Vektörel Ant System: M karınca her adımda birlikte bir adım atar.
+        Komşuluklar max_deg genişliğine doldurulur, geçersiz slotlar -inf
+        logit alır ve sonraki düğüm Gumbel-max hilesiyle tek argmax ile seçilir.
+        """
+        m = self.ant_count
+        s = self.node_index[src]
+        t = self.node_index[dst]
+
+        if s == t:
+            return [np.array([s], dtype=np.int64) for _ in range(m)]
+
+        edge_ok = self.bw >= demand_bw
+
+        current = np.full(m, s, dtype=np.int64)
+        visited = self._batch_visited
+        visited[:, s] = True
+        alive = np.ones(m, dtype=np.bool_)
+        done = np.zeros(m, dtype=np.bool_)
+        plen = np.ones(m, dtype=np.int64)
+        columns = [current.copy()]
+        offsets = np.arange(self.max_deg)
+
+        for _ in range(self.max_steps):
+            ants = np.flatnonzero(alive)
+            if ants.size == 0:
+                break
+
+            # Düzensiz komşulukları (A, max_deg) matrisine doldur
+            start = self.indptr[current[ants]]
+            count = self.indptr[current[ants] + 1] - start
+            valid = offsets[None, :] < count[:, None]
+            slots = np.where(valid, start[:, None] + offsets[None, :], 0)
+            nbrs = self.indices[slots]
+            eids = self.edge_ids[slots]
+            valid &= edge_ok[eids] & ~visited[ants[:, None], nbrs]
+
+            logits = np.where(
+                valid, self.alpha * self.log_pher[eids] + self._log_eta_beta[eids], -np.inf
+            )
+            gumbel = -np.log(-np.log(self._rng.random(logits.shape)))
+            choice = np.argmax(logits + gumbel, axis=1)
+
+            # Çıkmaz sokaktaki karıncalar ölür
+            has_move = valid.any(axis=1)
+            alive[ants[~has_move]] = False
+
+            movers = ants[has_move]
+            nxt = nbrs[has_move, choice[has_move]]
+            current[movers] = nxt
+            visited[movers, nxt] = True
+            plen[movers] += 1
+
+            column = np.full(m, -1, dtype=np.int64)
+            column[movers] = nxt
+            columns.append(column)
+
+            arrived = movers[nxt == t]
+            alive[arrived] = False
+            done[arrived] = True
+
+        steps = np.stack(columns)
+
+        # Tüm matrisi sıfırlamak yerine yalnızca işaretlenen hücreleri temizle
+        touched = steps >= 0
+        visited[np.nonzero(touched)[1], steps[touched]] = False
+
+        return [steps[:plen[i], i].copy() if done[i] else None for i in range(m)]
 
     # --------------------------------------------------
     # YARDIMCI: Maliyet Hesabı
     # --------------------------------------------------
-    def _calculate_path_cost(self, path):
-        attrs = calculate_path_attributes(self.graph, path)
+    def _calculate_path_cost(self, path_arr, eids=None):
+        attrs = self.index.path_attributes(path_arr, eids)
         return calculate_weighted_cost(attrs, self.weights)
 
     # --------------------------------------------------
     # YARDIMCI: Feromon Güncelleme
     # --------------------------------------------------
-    def _update_pheromones(self, all_paths):
+    def _update_pheromones(self, paths_eids, deposits):
         """
         1. Buharlaşma (Evaporation)
         2. Yeni feromon ekleme (Deposit)
+        paths_eids[i]: i. karıncanın yolundaki edge_id'ler, deposits[i]: bırakacağı miktar
         """
         # 1. Buharlaşma: Mevcut tüm feromonları azalt
-        for edge in self.pheromones:
-            self.pheromones[edge] *= (1.0 - self.evaporation)
-            # Alt sınır koyalım ki feromon tamamen sıfırlanmasın (keşif devam etsin)
-            if self.pheromones[edge] < 0.01:
-                self.pheromones[edge] = 0.01
+        self.pher *= (1.0 - self.evaporation)
+        # Alt sınır koyalım ki feromon tamamen sıfırlanmasın (keşif devam etsin)
+        np.maximum(self.pher, 0.01, out=self.pher)
 
         # 2. Ekleme: Bu turdaki karıncaların geçtiği yolları ödüllendir
-        for path, cost in all_paths:
-            # Maliyet ne kadar düşükse, ödül o kadar büyük olsun
-            deposit = self.q / (cost + 0.0001)
-            
-            for i in range(len(path) - 1):
-                u, v = path[i], path[i+1]
-                # Yönsüz graf olduğu için iki yöne de ekle
-                if (u, v) in self.pheromones:
-                    self.pheromones[(u, v)] += deposit
-                if (v, u) in self.pheromones:
-                    self.pheromones[(v, u)] += deposit
\ No newline at end of file
+        # Tüm yollar tek diziye düzleştirilir; aynı kenar birden çok yolda
+        # geçebileceği için += yerine np.add.at (tekrarlı indeks güvenli)
+        # Yönsüz graf olduğu için iki yön aynı edge_id'yi paylaşır
+        if paths_eids:
+            all_eids = np.concatenate(paths_eids)
+            all_dep = np.repeat(np.array(deposits), [len(e) for e in paths_eids])
+            np.add.at(self.pher, all_eids, all_dep)
+
+        # log(tau) her adımda değil, yalnızca feromon değiştiğinde yenilenir
+        self.log_pher = np.log(self.pher)
@@ -0,0 +1,30 @@
+"""
+Numba isteğe bağlı bir bağımlılıktır.
+
+Kurulu değilse `njit` hiçbir şey yapmayan bir dekoratöre dönüşür;
+algoritmalar NUMBA_AVAILABLE bayrağına bakarak saf Python/NumPy
+yoluna geri düşer. `objmode` (derlenmiş kodun içinden Python çağırma
+bloğu) da aynı şekilde etkisiz bir bağlam yöneticisine dönüşür.
+"""
+
+from contextlib import contextmanager
+
+try:
+    from numba import njit, objmode
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    @contextmanager
+    def objmode(*args, **kwargs):
+        """Numba yokken kod zaten Python'da çalışır; blok olduğu gibi yürütülür."""
+        yield
+
+    def njit(*args, **kwargs):
+        """Numba yokken fonksiyonu olduğu gibi döndürür."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
@@ -17,11 +17,272 @@ Amaç:
 - Kararlı ve tekrarlanabilir öğrenme süreci
 """
 
-import random
+import time
 from typing import List, Optional, Dict, Any
+import numpy as np
 import networkx as nx
 
-from src.metrics import calculate_path_attributes, calculate_weighted_cost
+from src.metrics import calculate_weighted_cost
+from src.graph_index import GraphIndex
+from .numba_compat import njit, objmode, NUMBA_AVAILABLE
+
+
+# Çekirdeğin rastgele sayı kaynağı. Numba'lı derlemede np.random çağrıları
+# Numba'nın kendi RNG'sini kullanır (NumPy'ın global durumuna dokunmaz).
+# Numba yokken çekirdek saf Python çalışır; np.random.seed süreç genelindeki
+# NumPy RNG'sini değiştireceği için modüle ait bir RandomState kullanılır
+# (aynı MT19937 akışı: tohum aynıysa sonuçlar Numba'lı çalıştırmayla aynıdır).
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _seed_rng(seed):
+        np.random.seed(seed)
+
+    @njit(cache=True)
+    def _rand():
+        return np.random.random()
+
+    @njit(cache=True)
+    def _randint(n):
+        return np.random.randint(0, n)
+else:
+    _fallback_rng = np.random.RandomState()
+
+    def _seed_rng(seed):
+        _fallback_rng.seed(seed)
+
+    def _rand():
+        return _fallback_rng.random_sample()
+
+    def _randint(n):
+        return _fallback_rng.randint(0, n)
+
+
+@njit(cache=True)
+def _feasible_csr(indptr, edge_ids, bw, demand_bw):
+    """
+    Bant genişliği demand_bw'yi karşılayan slotlardan süzülmüş CSR kurar.
+    slots_f[indptr_f[s]:indptr_f[s+1]], s düğümünün uygun tam-CSR slotlarıdır.
+    """
+    n = indptr.shape[0] - 1
+    indptr_f = np.empty(n + 1, dtype=np.int64)
+    slots_f = np.empty(indptr[n], dtype=np.int32)
+    k = 0
+    for s in range(n):
+        indptr_f[s] = k
+        for j in range(indptr[s], indptr[s + 1]):
+            if bw[edge_ids[j]] >= demand_bw:
+                slots_f[k] = j
+                k += 1
+    indptr_f[n] = k
+    return indptr_f, slots_f[:k]
+
+
+@njit(cache=True)
+def _reachable(indptr_f, slots_f, indices, src, dst, visited):
+    """
+    Süzülmüş CSR üzerinde src'den dst'ye yol var mı (BFS)?
+    visited girişte sıfır olmalıdır; çıkışta işaretlenen düğümler temizlenir.
+    """
+    queue = np.empty(indptr_f.shape[0] - 1, dtype=np.int32)
+    queue[0] = src
+    visited[src] = 1
+    head = 0
+    tail = 1
+    found = src == dst
+
+    while head < tail and not found:
+        u = queue[head]
+        head += 1
+        for jj in range(indptr_f[u], indptr_f[u + 1]):
+            v = indices[slots_f[jj]]
+            if visited[v] == 0:
+                visited[v] = 1
+                queue[tail] = v
+                tail += 1
+                if v == dst:
+                    found = True
+                    break
+
+    for i in range(tail):
+        visited[queue[i]] = 0
+    return found
+
+
+@njit(cache=True)
+def _train_kernel(indptr_f, slots_f, indices, edge_ids, edge_cost, node_cost,
+                  end_cost, Q, src, dst, alpha, gamma, eps_sched,
+                  episodes, max_steps, step_penalty,
+                  progress_bonus, best_cost, seed, visited, path, best_buf):
+    """
+    Q-Learning bölüm (episode) döngüsünün derlenmiş çekirdeği.
+
+    Q, tam CSR slotu başına bir değer tutar: Q[j] = Q(s, indices[j]).
+    Aksiyonlar süzülmüş CSR'den gelir: s düğümünün uygun (bant genişliği
+    yeterli) slotları slots_f[indptr_f[s]:indptr_f[s+1]] içindedir; bu
+    yüzden hedefe ulaşan her yol kısıtı zaten sağlar.
+    visited, path ve best_buf çağıranın bir kez ayırdığı tamponlardır;
+    iyileşmede yol best_buf'a kopyalanır (yeni liste/dizi oluşturulmaz).
+    visited (uint8 maske) girişte sıfır olmalıdır ve çıkışta yine sıfırdır.
+    eps_sched[ep]: ep. bölümdeki keşif oranı (önceden hesaplanmış takvim).
+    Yol maliyeti adım adım biriktirilir: edge_cost / node_cost ağırlıklarla
+    önceden birleştirilmiş terimler, end_cost S ve D düğümlerinin (yalnızca
+    güvenilirlik) sabit katkısıdır; sonuç calculate_weighted_cost ile aynıdır.
+    Dönüş: (best_len, best_cost); best_len = 0 ise bu eğitimde daha iyi
+    bir yol bulunmamıştır.
+    Rastgelelik çekirdeğin kendi RNG'sinden gelir ve girişte seed ile tohumlanır
+    (bkz. _seed_rng).
+    """
+    _seed_rng(seed)
+
+    n = indptr_f.shape[0] - 1
+    best_len = 0
+
+    # Hedef dışı her adımın ödülü eğitim boyunca sabittir
+    step_reward = step_penalty + progress_bonus
+
+    # Geçerli aksiyonların (CSR slotlarının) toplandığı tekrar kullanılan tampon
+    max_deg = 0
+    for s in range(n):
+        if indptr_f[s + 1] - indptr_f[s] > max_deg:
+            max_deg = indptr_f[s + 1] - indptr_f[s]
+    valid_buf = np.empty(max_deg, dtype=np.int32)
+
+    for ep in range(episodes):
+        epsilon = eps_sched[ep]
+        state = src
+        visited[state] = 1
+        path[0] = state
+        plen = 1
+        steps = 0
+        acc_cost = end_cost
+
+        while state != dst and steps < max_steps:
+            steps += 1
+            start = indptr_f[state]
+            end = indptr_f[state + 1]
+
+            # Epsilon-greedy aksiyon seçimi (yalnızca döngü oluşturmayan aksiyonlar)
+            if _rand() < epsilon:
+                # Keşif: geçerli slotları valid_buf[:k] içine topla, birini seç
+                k = 0
+                for jj in range(start, end):
+                    j = slots_f[jj]
+                    if visited[indices[j]] == 0:
+                        valid_buf[k] = j
+                        k += 1
+                if k == 0:
+                    break
+                slot = valid_buf[_randint(k)]
+            else:
+                # Sömürü: ziyaret edilmiş komşular maskelenerek tek geçişte argmax
+                slot = -1
+                best_q = -np.inf
+                for jj in range(start, end):
+                    j = slots_f[jj]
+                    if visited[indices[j]] == 0 and (slot < 0 or Q[j] > best_q):
+                        best_q = Q[j]
+                        slot = j
+                if slot < 0:
+                    break
+
+            next_state = indices[slot]
+            path[plen] = next_state
+            plen += 1
+            visited[next_state] = 1
+
+            # Maliyeti biriktir (ara düğümlerin işlem süresi + güvenilirliği dahil)
+            acc_cost += edge_cost[edge_ids[slot]]
+            if next_state != dst:
+                acc_cost += node_cost[next_state]
+
+            # Adım cezası + ilerleme bonusu (sabit)
+            reward = step_reward
+
+            # Hedefe ulaşıldığında (bant genişliği kısıtı süzmeyle garanti)
+            if next_state == dst:
+                cost = max(acc_cost, 1e-6)
+                reward = 2000.0 / cost
+                if cost < best_cost:
+                    best_cost = cost
+                    best_buf[:plen] = path[:plen]
+                    best_len = plen
+
+            # Q-değer güncellemesi (gelecek değer yalnızca uygun aksiyonlar üzerinden)
+            future_q = 0.0
+            nstart = indptr_f[next_state]
+            nend = indptr_f[next_state + 1]
+            if nend > nstart:
+                future_q = Q[slots_f[nstart]]
+                for jj in range(nstart + 1, nend):
+                    if Q[slots_f[jj]] > future_q:
+                        future_q = Q[slots_f[jj]]
+            Q[slot] += alpha * (reward + gamma * future_q - Q[slot])
+
+            state = next_state
+
+        # Ziyaret maskesini yalnızca bu bölümün yolu üzerinden sıfırla
+        for i in range(plen):
+            visited[path[i]] = 0
+
+    return best_len, best_cost
+
+
+@njit(cache=True)
+def _train_batch_kernel(indptr, indices, edge_ids, bw, edge_cost, node_cost,
+                        node_rel_w, Q, srcs, dsts, demand_bws, alpha, gamma,
+                        eps_sched, episodes, max_steps, step_penalty,
+                        progress_bonus, seeds, visited, path, out_paths,
+                        out_lens, out_costs, out_runtimes):
+    """
+    Aynı ağırlıkları paylaşan D talebi tek çekirdek çağrısında eğitir.
+    Her talep bağımsızdır: Q sıfırlanır, keşif takvimi baştan başlar.
+    Talep d için en iyi yol out_paths[d, :out_lens[d]], maliyeti out_costs[d]
+    (yol yoksa out_lens[d] = 0), süresi out_runtimes[d] saniyedir.
+    """
+    for d in range(srcs.shape[0]):
+        with objmode(t0='float64'):
+            t0 = time.perf_counter()
+
+        Q[:] = 0.0
+        out_lens[d] = 0
+        out_costs[d] = np.inf
+        s = srcs[d]
+        t = dsts[d]
+
+        indptr_f, slots_f = _feasible_csr(indptr, edge_ids, bw, demand_bws[d])
+        if _reachable(indptr_f, slots_f, indices, s, t, visited):
+            best_len, best_cost = _train_kernel(
+                indptr_f, slots_f, indices, edge_ids, edge_cost, node_cost,
+                node_rel_w[s] + node_rel_w[t], Q, s, t, alpha, gamma, eps_sched,
+                episodes, max_steps, step_penalty, progress_bonus, np.inf,
+                seeds[d], visited, path, out_paths[d]
+            )
+            out_lens[d] = best_len
+            out_costs[d] = best_cost
+
+        with objmode(t1='float64'):
+            t1 = time.perf_counter()
+        out_runtimes[d] = t1 - t0
+
+
+def _single_run(index, weights, hyperparams, src, dst, demand_bw, seed):
+    """
+    run_multiple için tek bir bağımsız eğitim (yeni yönlendirici, kendi tohumu).
+    Yalnızca GraphIndex paylaşılır, NetworkX grafı kullanılmaz.
+    """
+    router = QLearningRouter(None, weights, index=index, seed=seed, **hyperparams)
+    router.train(src, dst, demand_bw)
+    return router.best_path, router.best_cost
+
+
+def warmup_kernels():
+    """
+    Çekirdeği küçük bir graf üzerinde bir kez çalıştırır; böylece derleme
+    (veya önbellekten yükleme) maliyeti ilk deneyde değil içe aktarmada ödenir.
+    """
+    router = QLearningRouter(nx.path_graph(2), {}, episodes=1, max_steps=1)
+    router.train(0, 1)
+    router.train_batch([0], [1], [0])
 
 
 class QLearningRouter:
@@ -41,7 +302,9 @@ class QLearningRouter:
         episodes: int = 4000,
         max_steps: int = 100,
         step_penalty: float = -2.0,
-        progress_bonus: float = 0.5
+        progress_bonus: float = 0.5,
+        index: Optional[GraphIndex] = None,
+        seed: Optional[int] = None
     ):
         # Ağ topolojisi
         self.graph = graph
@@ -62,16 +325,27 @@ class QLearningRouter:
         self.step_penalty = step_penalty
         self.progress_bonus = progress_bonus
 
-        # Q-tablosu: Q[state][action]
-        self.Q: Dict[int, Dict[int, float]] = {
-            node: {nbr: 0.0 for nbr in graph.neighbors(node)}
-            for node in graph.nodes
-        }
+        # Dizi tabanlı graf görünümü (CSR + kenar/düğüm metrik dizileri)
+        self.index = index or GraphIndex(graph)
+
+        # Yerel RNG: her train() çağrısı için çekirdeğe buradan bir tohum verilir.
+        # Süreçler arası paylaşılan global durum yok; seed verilirse tekrarlanabilir.
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+
+        # Q-tablosu: CSR slotu başına bir değer, Q[slot] = Q(state, action)
+        self.Q = np.zeros(len(self.index.indices), dtype=np.float64)
 
         # Eğitim sırasında bulunan en iyi yol
         self.best_path: Optional[List[int]] = None
         self.best_cost: float = float("inf")
 
+        # Çekirdeğin bölüm yolu, ziyaret maskesi ve en iyi yol için
+        # tekrar kullanılan tamponlar
+        self._visited = np.zeros(self.index.n_nodes, dtype=np.uint8)
+        self._path_buf = np.empty(max_steps + 1, dtype=np.int32)
+        self._best_path_buf = np.empty(max_steps + 1, dtype=np.int32)
+
     # --------------------------------------------------
     # Eğitim (Training)
     # --------------------------------------------------
@@ -79,69 +353,128 @@ class QLearningRouter:
         """
         Verilen kaynak (src) ve hedef (dst) düğümleri için
         Q-Learning eğitimi gerçekleştirir.
+        Bölüm döngüsü derlenmiş çekirdekte (_train_kernel) çalışır.
         """
+        ix = self.index
+        s, t = ix.node_index[src], ix.node_index[dst]
+
+        # Talep sabit: bant genişliği yetersiz kenarlar aksiyon kümesinden
+        # baştan çıkarılır (süzülmüş CSR, slotlar tam CSR'ye işaret eder)
+        indptr_f, slots_f = _feasible_csr(ix.indptr, ix.edge_ids, ix.bw, float(demand_bw))
+
+        # Kısıtı sağlayan bir yol yoksa eğitime hiç girme
+        if not _reachable(indptr_f, slots_f, ix.indices, s, t, self._visited):
+            return
+
+        edge_cost, node_cost, node_rel_w = self._cost_arrays()
+        end_cost = node_rel_w[s] + node_rel_w[t]
+        eps_sched = self._epsilon_schedule()
+
+        best_len, self.best_cost = _train_kernel(
+            indptr_f, slots_f, ix.indices, ix.edge_ids,
+            edge_cost, node_cost, float(end_cost), self.Q, s, t,
+            float(self.alpha), float(self.gamma), eps_sched,
+            int(self.episodes), int(self.max_steps),
+            float(self.step_penalty), float(self.progress_bonus),
+            float(self.best_cost), int(self._rng.integers(0, 2**31 - 1)),
+            self._visited, self._path_buf, self._best_path_buf
+        )
+        self.best_cost = float(self.best_cost)
+        self.epsilon = float(eps_sched[-1])
 
-        for _ in range(self.episodes):
-            state = src
-            visited = {state}
-            path = [state]
-            steps = 0
-            min_bw_on_path = float("inf")
+        if best_len > 0:
+            self.best_path = ix.node_labels(self._best_path_buf[:best_len])
 
-            while state != dst and steps < self.max_steps:
-                steps += 1
+    def train_batch(self, srcs, dsts, demand_bws):
+        """
+        Aynı ağırlıklarla birden çok talebi tek çekirdek çağrısında eğitir.
+        Her talep, yeni bir yönlendiriciyle train() çağrılmış gibi bağımsızdır.
+        srcs/dsts/demand_bws liste veya dizi olabilir (ör. demands_df sütunları).
 
-                # Döngü oluşturmayan geçerli aksiyonlar
-                actions = [a for a in self.Q[state] if a not in visited]
-                if not actions:
-                    break
+        Dönüş: (paths, costs, runtimes) -> paths[d] en iyi yol (yoksa None),
+        costs[d] maliyeti (yoksa inf), runtimes[d] eğitim süresi (saniye).
+        Q tablosu talepler arasında çalışma alanı olarak kullanılır.
+        """
+        ix = self.index
+        srcs = np.array([ix.node_index[v] for v in srcs], dtype=np.int64)
+        dsts = np.array([ix.node_index[v] for v in dsts], dtype=np.int64)
+        demand_bws = np.asarray(demand_bws, dtype=np.float64)
+        d = len(srcs)
+
+        edge_cost, node_cost, node_rel_w = self._cost_arrays()
+        out_paths = np.empty((d, self.max_steps + 1), dtype=np.int32)
+        out_lens = np.zeros(d, dtype=np.int64)
+        out_costs = np.empty(d, dtype=np.float64)
+        out_runtimes = np.empty(d, dtype=np.float64)
+
+        _train_batch_kernel(
+            ix.indptr, ix.indices, ix.edge_ids, ix.bw,
+            edge_cost, node_cost, node_rel_w, self.Q, srcs, dsts, demand_bws,
+            float(self.alpha), float(self.gamma), self._epsilon_schedule(),
+            int(self.episodes), int(self.max_steps),
+            float(self.step_penalty), float(self.progress_bonus),
+            self._rng.integers(0, 2**31 - 1, size=d), self._visited,
+            self._path_buf, out_paths, out_lens, out_costs, out_runtimes
+        )
+
+        paths = [
+            ix.node_labels(out_paths[i, :out_lens[i]]) if out_lens[i] > 0 else None
+            for i in range(d)
+        ]
+        return paths, out_costs, out_runtimes
 
-                # Epsilon-greedy aksiyon seçimi
-                if random.random() < self.epsilon:
-                    action = random.choice(actions)
-                else:
-                    action = max(actions, key=lambda a: self.Q[state][a])
-
-                # Bant genişliği darboğazı takibi
-                bw = self.graph.edges[state, action].get("bandwidth", 0)
-                min_bw_on_path = min(min_bw_on_path, bw)
-
-                next_state = action
-                path.append(next_state)
-                visited.add(next_state)
-
-                # Temel adım cezası (kısa yolları teşvik eder)
-                reward = self.step_penalty
-
-                # Hedefe doğru ilerleme bonusu (heuristic)
-                reward += self.progress_bonus
-
-                # Hedefe ulaşıldığında
-                if next_state == dst:
-                    attrs = calculate_path_attributes(self.graph, path)
-                    cost = calculate_weighted_cost(attrs, self.weights)
-                    cost = max(cost, 1e-6)
-
-                    # Bant genişliği kısıtı kontrolü
-                    if min_bw_on_path >= demand_bw:
-                        reward = 2000.0 / cost
-                        if cost < self.best_cost:
-                            self.best_cost = cost
-                            self.best_path = path.copy()
-                    else:
-                        reward = -1.0
-
-                # Q-değer güncellemesi
-                future_q = max(self.Q[next_state].values(), default=0.0)
-                self.Q[state][action] += self.alpha * (
-                    reward + self.gamma * future_q - self.Q[state][action]
-                )
-
-                state = next_state
-
-            # Keşif oranını azalt
-            if self.epsilon > self.min_epsilon:
-                self.epsilon *= self.epsilon_decay
+    def _cost_arrays(self):
+        """
+        Ağırlıklar eğitim boyunca sabit: maliyet terimleri bir kez birleştirilir.
+        Dönüş: (edge_cost, node_cost, node_rel_w); S ve D'nin sabit katkısı
+        node_rel_w[s] + node_rel_w[t]'dir (uç düğümlerde yalnızca güvenilirlik).
+        """
+        ix = self.index
+        w_d = self.weights.get('w_delay', 0)
+        w_r = self.weights.get('w_reliability', 0)
+        w_res = self.weights.get('w_resource', 0)
+        edge_cost = w_d * ix.delay_cost + w_r * ix.rel_cost + w_res * ix.res_cost
+        node_cost = w_d * ix.node_proc + w_r * ix.node_rel_cost
+        return edge_cost, node_cost, w_r * ix.node_rel_cost
+
+    def _epsilon_schedule(self):
+        """
+        Keşif oranı takvimi: epsilon min_epsilon'a inene (veya altına düşene)
+        kadar her bölümde epsilon_decay ile çarpılır, sonra sabit kalır.
+        eps_sched[episodes] bir sonraki train() çağrısının başlangıç değeridir.
+        """
+        eps_sched = self.epsilon * self.epsilon_decay ** np.arange(
+            self.episodes + 1, dtype=np.float64
+        )
+        stop = np.flatnonzero(eps_sched <= self.min_epsilon)
+        if stop.size:
+            eps_sched[stop[0]:] = eps_sched[stop[0]]
+        return eps_sched
+
+    # --------------------------------------------------
+    # Q-Tablosu Erişimi
+    # --------------------------------------------------
+    def _q_slice(self, state: int):
+        """state düğümünün Q dizisindeki [start, end) slot aralığı."""
+        s = self.index.node_index[state]
+        return self.index.indptr[s], self.index.indptr[s + 1]
+
+    def q_get(self, state: int, action: int) -> float:
+        """Q(state, action) değerini döndürür."""
+        start, end = self._q_slice(state)
+        local = np.flatnonzero(
+            self.index.indices[start:end] == self.index.node_index[action]
+        )
+        if local.size == 0:
+            raise KeyError((state, action))
+        return float(self.Q[start + local[0]])
+
+    def q_argmax(self, state: int) -> Optional[int]:
+        """state düğümünde en yüksek Q değerine sahip aksiyonu (komşu düğüm) döndürür."""
+        start, end = self._q_slice(state)
+        if end == start:
+            return None
+        return self.index.nodes[self.index.indices[start + self.Q[start:end].argmax()]]
 
     # --------------------------------------------------
     # En İyi Yolun Alınması (GUI Uyumlu)
@@ -171,25 +504,19 @@ class QLearningRouter:
         if not path or len(path) < 2:
             return {"valid": False, "error": "Geçerli bir yol bulunamadı"}
 
-        attrs = calculate_path_attributes(self.graph, path)
+        # Yol -> düğüm indeksleri ve edge_id'ler; tüm metrikler dizi toplamaları
+        path_arr = self.index.path_array(path)
+        eids = self.index.edge_ids_of(path_arr)
+
+        attrs = self.index.path_attributes(path_arr, eids)
 
         # Toplam güvenilirlik (çarpımsal)
-        total_reliability = 1.0
-        for i in range(len(path) - 1):
-            total_reliability *= self.graph.edges[
-                path[i], path[i + 1]
-            ].get("reliability", 1.0)
-
-        for n in path:
-            total_reliability *= self.graph.nodes[n].get(
-                "reliability", 1.0
-            )
+        total_reliability = float(
+            self.index.rel[eids].prod() * self.index.node_rel[path_arr].prod()
+        )
 
         # Darboğaz bant genişliği
-        min_bw = min(
-            self.graph.edges[path[i], path[i + 1]].get("bandwidth", float("inf"))
-            for i in range(len(path) - 1)
-        )
+        min_bw = float(self.index.bw[eids].min())
 
         if min_bw < demand_bw:
             return {"valid": False, "error": "Bant genişliği kısıtı sağlanmadı"}
@@ -224,36 +551,42 @@ class QLearningRouter:
         - Q-tablosunu sıfırdan başlatır
         - Epsilon değerini başlangıç seviyesine alır
         - Öğrenme sürecini bağımsız yürütür
+
+        Her çalıştırma SeedSequence'tan türetilen farklı bir tohum alır.
+        Tek bir eğitim milisaniyeler sürdüğü için çalıştırmalar aynı süreçte
+        sırayla yürütülür (süreç havuzu kurmanın maliyeti daha yüksektir).
         """
+        hyperparams = {
+            "alpha": self.alpha,
+            "gamma": self.gamma,
+            "initial_epsilon": 1.0,  # Keşif oranını yeniden başlat
+            "min_epsilon": self.min_epsilon,
+            "epsilon_decay": self.epsilon_decay,
+            "episodes": self.episodes,
+            "max_steps": self.max_steps,
+            "step_penalty": self.step_penalty,
+            "progress_bonus": self.progress_bonus,
+        }
+        seeds = np.random.SeedSequence(self.seed).generate_state(runs)
+
+        results = [
+            _single_run(
+                self.index, self.weights, hyperparams,
+                src, dst, demand_bw, int(seed)
+            )
+            for seed in seeds
+        ]
 
         global_best_cost = float("inf")
         global_best_path: Optional[List[int]] = None
 
-        for _ in range(runs):
-            # Her çalıştırma için öğrenme durumunu sıfırla
-            self.Q = {
-                node: {nbr: 0.0 for nbr in self.graph.neighbors(node)}
-                for node in self.graph.nodes
-            }
-            self.best_path = None
-            self.best_cost = float("inf")
-            self.epsilon = 1.0  # Keşif oranını yeniden başlat
-
-            # Eğitimi çalıştır
-            self.train(src, dst, demand_bw)
-
-            # Bu çalıştırmanın sonucu
-            if self.best_path is not None:
-                attrs = calculate_path_attributes(self.graph, self.best_path)
-                cost = calculate_weighted_cost(attrs, self.weights)
-
-                if cost < global_best_cost:
-                    global_best_cost = cost
-                    global_best_path = self.best_path.copy()
+        for best_path, best_cost in results:
+            if best_path is not None and best_cost < global_best_cost:
+                global_best_cost = best_cost
+                global_best_path = best_path
 
         # Tüm çalıştırmalar arasındaki en iyi yol
         self.best_path = global_best_path
         self.best_cost = global_best_cost
 
         return global_best_path
-
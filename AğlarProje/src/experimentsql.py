@@ -8,26 +8,112 @@ Bu dosya sadece Q-Learning algoritması için deney düzeneğini uygular (PDF sa
 - Sonuçlar kök dizindeki 'results/' klasörüne CSV olarak kaydedilir
 """
 
-import time
+import csv
 import os
+import numpy as np
 import pandas as pd
-from statistics import mean, stdev
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional
 
 # Proje modüllerini doğru yol ile import et
 from src.network_generator import NetworkManager
 from src.algorithms.q_learning import QLearningRouter
-from src.metrics import calculate_path_attributes, calculate_weighted_cost
+from src.metrics import calculate_weighted_cost
+
+# Çalıştırma başına bir satır: tamamlandıkça *_runs.csv dosyasına yazılır
+RUN_FIELDS = [
+    'demand_id', 'src', 'dst', 'demand_bw', 'weight_set', 'weights', 'run',
+    'runtime', 'valid', 'cost', 'delay', 'rel_cost', 'res_cost'
+]
+
+# İşçi süreç başına bir kez yüklenen graf indeksi (bkz. _init_worker)
+_worker_index = None
+
+
+def _init_worker(index):
+    """ProcessPoolExecutor initializer: GraphIndex'i her işçiye bir kez yükler."""
+    global _worker_index
+    _worker_index = index
+
+
+def run_batch(task) -> List[Dict]:
+    """
+    Bir (ağırlık seti, çalıştırma) için tüm talepleri tek toplu eğitimle çözer.
+    Ağırlıklar ortak olduğundan maliyet dizileri bir kez hazırlanır ve talepler
+    tek bir JIT çağrısında sırayla eğitilir (bkz. QLearningRouter.train_batch).
+    Geriye talep başına bir satır (dict) listesi döndürür.
+    """
+    weight_idx, weights, weights_str, (ids, srcs, dsts, bws), run, episodes, seed = task
+    index = _worker_index
+
+    ql = QLearningRouter(
+        graph=None,
+        weights=weights,
+        alpha=0.1,
+        gamma=0.9,
+        initial_epsilon=1.0,
+        episodes=episodes,
+        max_steps=500,
+        index=index,
+        seed=seed
+    )
+
+    paths, _, runtimes = ql.train_batch(srcs, dsts, bws)
+
+    rows = []
+    for i, best_path in enumerate(paths):
+        demand_bw = float(bws[i])
+        row = {
+            'demand_id': int(ids[i]),
+            'src': int(srcs[i]),
+            'dst': int(dsts[i]),
+            'demand_bw': demand_bw,
+            'weight_set': weight_idx,
+            'weights': weights_str,
+            'run': run,
+            'runtime': float(runtimes[i]),
+            'valid': False,
+        }
+
+        if best_path and len(best_path) > 1:
+            path_arr = index.path_array(best_path)
+            eids = index.edge_ids_of(path_arr)
+            attrs = index.path_attributes(path_arr, eids)
+
+            # Darboğaz kontrolü
+            min_bw = index.bw[eids].min()
+
+            if min_bw >= demand_bw:
+                row.update({
+                    'valid': True,
+                    'cost': calculate_weighted_cost(attrs, weights),
+                    'delay': attrs['total_delay'],
+                    'rel_cost': attrs['reliability_cost'],
+                    'res_cost': attrs['resource_cost'],
+                })
+
+        rows.append(row)
+
+    return rows
 
 
 def run_qlearning_experiments(
     num_runs: int = 5,
     episodes: int = 5000,
     weight_sets: List[Dict[str, float]] = None,
-    output_file: str = "results/qlearning_experiment_results.csv"
+    output_file: str = "results/qlearning_experiment_results.csv",
+    seed: Optional[int] = None
 ) -> pd.DataFrame:
     """
     Q-Learning deneylerini çalıştırır ve sonuçları CSV'ye kaydeder.
+
+    Her (ağırlık seti, çalıştırma) bir iştir ve tüm talepleri tek toplu
+    eğitimle çözer; işler ProcessPoolExecutor ile paralel çözülür.
+    Talepler birbirinden bağımsızdır (her biri kendi tohumu ve sıfır Q
+    tablosuyla eğitilir). Her çalıştırmanın satırı
+    bittiği anda output_file yanındaki *_runs.csv dosyasına yazılır
+    (bellekte tutulmaz); istatistikler bu dosyadan pandas groupby ile
+    (ağırlık seti, talep) gruplarında hesaplanır.
     """
     if weight_sets is None:
         weight_sets = [
@@ -39,123 +125,91 @@ def run_qlearning_experiments(
 
     print("Ağ ve talepler yükleniyor...")
     nm = NetworkManager()
-    graph, demands = nm.load_from_csv(
+    nm.load_from_csv(
         'data/BSM307_317_Guz2025_TermProject_NodeData.csv',
         'data/BSM307_317_Guz2025_TermProject_EdgeData.csv',
         'data/BSM307_317_Guz2025_TermProject_DemandData.csv'
     )
 
-    print(f"{len(demands)} talep bulundu. {len(weight_sets)} ağırlık seti ile {num_runs} tekrar başlıyor...\n")
+    # Talepler sütun dizileri olarak bir kez çıkarılır ve her işe aynen verilir
+    demands_df = nm.demands_df
+    demands = (
+        demands_df['id'].to_numpy(),
+        demands_df['src'].to_numpy(),
+        demands_df['dst'].to_numpy(),
+        demands_df['bandwidth_needed'].to_numpy()
+    )
 
-    results = []
+    print(f"{len(demands_df)} talep bulundu. {len(weight_sets)} ağırlık seti ile {num_runs} tekrar başlıyor...\n")
 
+    # İş listesi: her (ağırlık seti, çalıştırma) ayrı bir tohum alır; talep
+    # başına tohumlar bundan türetilir (ağırlık setinin metin hali bir kez üretilir)
+    tasks = []
     for weight_idx, weights in enumerate(weight_sets, 1):
-        print(f"--- Ağırlık Seti {weight_idx}/{len(weight_sets)}: {weights} ---")
-
-        for demand in demands:
-            demand_id = demand['id']
-            src = demand['src']
-            dst = demand['dst']
-            demand_bw = demand['bandwidth_needed']
-
-            print(f"  Talep {demand_id}: {src} → {dst} (B ≥ {demand_bw} Mbps)")
-
-            run_costs = []
-            run_times = []
-            run_delays = []
-            run_rel_costs = []
-            run_res_costs = []
-            valid_count = 0
-
-            for run in range(1, num_runs + 1):
-                start_time = time.time()
-
-                ql = QLearningRouter(
-                    graph=graph,
-                    weights=weights,
-                    alpha=0.1,
-                    gamma=0.9,
-                    initial_epsilon=1.0,
-                    episodes=episodes,
-                    max_steps=500
-                )
-
-                ql.train(src=src, dst=dst, demand_bw=demand_bw)
-
-                best_path = ql.get_best_path(src=src, dst=dst)
-
-                end_time = time.time()
-                runtime = end_time - start_time
-                run_times.append(runtime)
-
-                if best_path and len(best_path) > 1:
-                    attrs = calculate_path_attributes(graph, best_path)
-                    cost = calculate_weighted_cost(attrs, weights)
-
-                    # Darboğaz kontrolü
-                    min_bw = min(
-                        graph.edges[best_path[i], best_path[i+1]]['bandwidth']
-                        for i in range(len(best_path)-1)
-                    )
-
-                    if min_bw >= demand_bw:
-                        run_costs.append(cost)
-                        run_delays.append(attrs['total_delay'])
-                        run_rel_costs.append(attrs['reliability_cost'])
-                        run_res_costs.append(attrs['resource_cost'])
-                        valid_count += 1
-                    else:
-                        run_costs.append(float('inf'))
-                else:
-                    run_costs.append(float('inf'))
-
-            # İstatistikler
-            valid_costs = [c for c in run_costs if c < float('inf')]
-
-            row = {
-                'demand_id': demand_id,
-                'src': src,
-                'dst': dst,
-                'demand_bw': demand_bw,
-                'weight_set': weight_idx,
-                'weights': str(weights),
-                'num_runs': num_runs,
-                'valid_runs': valid_count,
-                'average_runtime_sec': mean(run_times),
-                'total_runtime_sec': sum(run_times)
-            }
-
-            if valid_costs:
-                row.update({
-                    'best_cost': min(valid_costs),
-                    'worst_cost': max(valid_costs),
-                    'average_cost': mean(valid_costs),
-                    'std_dev_cost': stdev(valid_costs) if len(valid_costs) > 1 else 0.0,
-                    'average_delay': mean(run_delays),
-                    'average_reliability_cost': mean(run_rel_costs),
-                    'average_resource_cost': mean(run_res_costs),
-                })
-            else:
-                row.update({
-                    'best_cost': None,
-                    'worst_cost': None,
-                    'average_cost': None,
-                    'std_dev_cost': None,
-                    'average_delay': None,
-                    'average_reliability_cost': None,
-                    'average_resource_cost': None,
-                })
-
-            results.append(row)
+        weights_str = str(weights)
+        for run in range(1, num_runs + 1):
+            tasks.append((weight_idx, weights, weights_str, demands, run, episodes))
+    seeds = np.random.SeedSequence(seed).generate_state(len(tasks))
+    tasks = [task + (int(s),) for task, s in zip(tasks, seeds)]
 
-    # Sonuçları kaydet (kök dizindeki results/ klasörüne)
-    df_results = pd.DataFrame(results)
-    
     # results klasörü yoksa oluştur
-    os.makedirs('results', exist_ok=True)
-    
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    runs_file = os.path.splitext(output_file)[0] + '_runs.csv'
+
+    with open(runs_file, 'w', newline='', encoding='utf-8') as f, ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=_init_worker,
+        initargs=(nm.index,)
+    ) as executor:
+        writer = csv.DictWriter(f, fieldnames=RUN_FIELDS)
+        writer.writeheader()
+
+        futures = [executor.submit(run_batch, task) for task in tasks]
+        for done, fut in enumerate(as_completed(futures), 1):
+            writer.writerows(fut.result())
+            f.flush()
+            print(f"  {done}/{len(futures)} toplu çalıştırma tamamlandı")
+
+    # İstatistikler: (ağırlık seti, talep) grupları
+    runs_df = pd.read_csv(runs_file).sort_values(['weight_set', 'demand_id', 'run'])
+    keys = ['weight_set', 'demand_id']
+
+    summary = runs_df.groupby(keys, sort=False).agg(
+        src=('src', 'first'),
+        dst=('dst', 'first'),
+        demand_bw=('demand_bw', 'first'),
+        weights=('weights', 'first'),
+        num_runs=('run', 'size'),
+        valid_runs=('valid', 'sum'),
+        average_runtime_sec=('runtime', 'mean'),
+        total_runtime_sec=('runtime', 'sum'),
+    )
+
+    valid_df = runs_df[runs_df['valid']].reindex(
+        columns=keys + ['cost', 'delay', 'rel_cost', 'res_cost']
+    )
+    cost_stats = valid_df.groupby(keys, sort=False).agg(
+        best_cost=('cost', 'min'),
+        worst_cost=('cost', 'max'),
+        average_cost=('cost', 'mean'),
+        std_dev_cost=('cost', 'std'),
+        average_delay=('delay', 'mean'),
+        average_reliability_cost=('rel_cost', 'mean'),
+        average_resource_cost=('res_cost', 'mean'),
+    )
+    # Tek geçerli çalıştırmada standart sapma 0 kabul edilir
+    cost_stats['std_dev_cost'] = cost_stats['std_dev_cost'].fillna(0.0)
+
+    df_results = summary.join(cost_stats).reset_index()[[
+        'demand_id', 'src', 'dst', 'demand_bw', 'weight_set', 'weights',
+        'num_runs', 'valid_runs', 'average_runtime_sec', 'total_runtime_sec',
+        'best_cost', 'worst_cost', 'average_cost', 'std_dev_cost',
+        'average_delay', 'average_reliability_cost', 'average_resource_cost'
+    ]]
+
     df_results.to_csv(output_file, index=False)
     print(f"\nTamamlandı! Sonuçlar '{output_file}' dosyasına kaydedildi.")
+    print(f"Çalıştırma bazlı ham sonuçlar: '{runs_file}'")
     print(f"Toplam {len(df_results)} satır sonuç.")
 
     return df_results
@@ -0,0 +1,151 @@
+import numpy as np
+import networkx as nx
+
+# u * N + v düz arama tablosunun izin verilen en büyük boyutu (N*N eleman)
+EDGE_LOOKUP_MAX_SIZE = 1 << 24
+
+
+class GraphIndex:
+    """
+    Grafın salt okunur, dizi tabanlı (SoA) görünümü.
+
+    Graf yüklendiğinde bir kez oluşturulur ve algoritmalar / metrik
+    hesapları tarafından paylaşılır:
+    - Kenar özellikleri edge_id ile indekslenen NumPy dizileri: bw, delay, rel
+    - Düğüm özellikleri düğüm indeksiyle: node_rel
+    - Metrik terimleri önceden hesaplanmış diziler: delay_cost, rel_cost,
+      res_cost (kenar), node_proc, node_rel_cost (düğüm)
+    - CSR komşuluk: indptr[N+1], indices[2E], edge_ids[2E]
+    - (u, v) -> edge_id düz tablosu: edge_id_lookup[u * N + v]
+    """
+
+    def __init__(self, graph: nx.Graph):
+        self.nodes = list(graph.nodes())
+        self.node_index = {n: i for i, n in enumerate(self.nodes)}
+
+        n = len(self.nodes)
+        edges = list(graph.edges(data=True))
+        m = len(edges)
+
+        self.n_nodes = n
+        self.n_edges = m
+
+        self.bw = np.empty(m, dtype=np.float64)
+        self.delay = np.empty(m, dtype=np.float64)
+        self.rel = np.empty(m, dtype=np.float64)
+
+        self.node_rel = np.array(
+            [graph.nodes[v].get('reliability', 1.0) for v in self.nodes],
+            dtype=np.float64
+        )
+
+        # calculate_path_attributes ile birebir aynı terimler (varsayılanlar dahil)
+        self.node_proc = np.array(
+            [graph.nodes[v].get('processing_time', 0) for v in self.nodes],
+            dtype=np.float64
+        )
+        self.node_rel_cost = -np.log(np.maximum(self.node_rel, 0.000001))
+        self.delay_cost = np.empty(m, dtype=np.float64)
+        res_bw = np.empty(m, dtype=np.float64)
+
+        # (u, v) -> edge_id (Yönsüz graf olduğu için iki yön de aynı kenar)
+        self.edge_id = {}
+
+        # Her yönsüz kenar iki yönlü slot üretir: u->v ve v->u
+        slot_src = np.empty(2 * m, dtype=np.int64)
+        slot_dst = np.empty(2 * m, dtype=np.int64)
+        slot_eid = np.empty(2 * m, dtype=np.int64)
+
+        for eid, (u, v, data) in enumerate(edges):
+            self.bw[eid] = data.get('bandwidth', 0)
+            self.delay[eid] = data.get('delay', 1.0)
+            self.rel[eid] = data.get('reliability', 1.0)
+            self.delay_cost[eid] = data.get('delay', 0)
+            res_bw[eid] = data.get('bandwidth', 1)
+
+            self.edge_id[(u, v)] = eid
+            self.edge_id[(v, u)] = eid
+
+            a, b = self.node_index[u], self.node_index[v]
+            slot_src[2 * eid], slot_dst[2 * eid] = a, b
+            slot_src[2 * eid + 1], slot_dst[2 * eid + 1] = b, a
+            slot_eid[2 * eid] = slot_eid[2 * eid + 1] = eid
+
+        self.rel_cost = -np.log(np.maximum(self.rel, 0.000001))
+        res_bw[res_bw <= 0] = 1
+        self.res_cost = 1000 / res_bw
+
+        # CSR: slotları kaynak düğüme göre sırala
+        order = np.argsort(slot_src, kind='stable')
+        self.indices = slot_dst[order].astype(np.int32)
+        self.edge_ids = slot_eid[order].astype(np.int32)
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(slot_src, minlength=n), out=self.indptr[1:])
+
+        self.max_deg = int(np.diff(self.indptr).max()) if n else 0
+
+        # Düz arama tablosu: edge_id_lookup[u * N + v] (kenar yoksa -1)
+        # Çok büyük graflarda N*N bellek gerektirdiği için sözlüğe geri düşülür
+        self.edge_id_lookup = None
+        if n * n <= EDGE_LOOKUP_MAX_SIZE:
+            self.edge_id_lookup = np.full(n * n, -1, dtype=np.int32)
+            self.edge_id_lookup[slot_src * n + slot_dst] = slot_eid
+
+        # İndeks algoritmalar arasında paylaşılır: dizileri salt okunur yap
+        for arr in vars(self).values():
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+
+    # --------------------------------------------------
+    # Yol -> Dizi Dönüşümleri
+    # --------------------------------------------------
+    def path_array(self, path):
+        """Düğüm etiketlerinden oluşan yolu düğüm indeksi dizisine çevirir."""
+        return np.fromiter(
+            (self.node_index[v] for v in path), dtype=np.int64, count=len(path)
+        )
+
+    def path_edge_ids(self, path):
+        """Yol üzerindeki ardışık (u, v) çiftlerinin edge_id dizisini döndürür."""
+        if self.edge_id_lookup is None:
+            return np.fromiter(
+                (self.edge_id[(u, v)] for u, v in zip(path[:-1], path[1:])),
+                dtype=np.int64, count=len(path) - 1
+            )
+        return self.edge_ids_of(self.path_array(path))
+
+    def edge_ids_of(self, path_arr):
+        """
+        Düğüm indeksi dizisi olarak verilen yolun edge_id dizisi.
+        Ardışık iki düğüm komşu değilse KeyError fırlatır (graph.edges[u, v] gibi).
+        """
+        if self.edge_id_lookup is None:
+            return self.path_edge_ids(self.node_labels(path_arr))
+        eids = self.edge_id_lookup[path_arr[:-1] * self.n_nodes + path_arr[1:]]
+        # -1 (kenar yok) NumPy'da "son eleman" olarak okunacağı için burada yakalanır
+        missing = np.flatnonzero(eids < 0)
+        if missing.size:
+            i = missing[0]
+            raise KeyError((self.nodes[path_arr[i]], self.nodes[path_arr[i + 1]]))
+        return eids
+
+    def node_labels(self, path_arr):
+        """Düğüm indeksi dizisini düğüm etiketlerinden oluşan listeye çevirir."""
+        return [self.nodes[i] for i in path_arr]
+
+    # --------------------------------------------------
+    # Yol Metrikleri
+    # --------------------------------------------------
+    def path_attributes(self, path_arr, eids=None):
+        """
+        calculate_path_attributes'ın dizi tabanlı karşılığı: Python döngüsü
+        yerine önceden hesaplanmış dizilerden toplama yapar.
+        path_arr: düğüm indeksi dizisi, eids: (varsa) yolun edge_id dizisi.
+        """
+        if eids is None:
+            eids = self.edge_ids_of(path_arr)
+        return {
+            'total_delay': float(self.delay_cost[eids].sum() + self.node_proc[path_arr[1:-1]].sum()),
+            'reliability_cost': float(self.rel_cost[eids].sum() + self.node_rel_cost[path_arr].sum()),
+            'resource_cost': float(self.res_cost[eids].sum())
+        }
@@ -1,31 +1,85 @@
+import numpy as np
 import pandas as pd
 import networkx as nx
 import random
 import os
 
+from src.graph_index import GraphIndex
+
+# load_from_csv önbelleği: (dosya yolları + değiştirilme zamanları) -> (graf, talepler, talep tablosu, indeks)
+# Aynı süreçte aynı dosyalar ikinci kez ayrıştırılmaz; dosya değişirse anahtar da değişir.
+# Graf ve talepler kopya olarak saklanır/verilir (bir yöneticideki değişiklik diğerlerine
+# sızmaz); salt okunur GraphIndex ise paylaşılır.
+_csv_cache = {}
+
+
+def _csv_cache_key(*files):
+    return tuple(
+        (os.path.abspath(f), os.path.getmtime(f)) if f else None
+        for f in files
+    )
+
+
+def _demands_frame(demands):
+    """
+    Talep listesinin sütun tabanlı (structure-of-arrays) hali: int32 id/src/dst,
+    float32 bandwidth_needed. Toplu işlemler sütunları doğrudan dizi olarak alır.
+    """
+    return pd.DataFrame({
+        'id': np.array([d['id'] for d in demands], dtype=np.int32),
+        'src': np.array([d['src'] for d in demands], dtype=np.int32),
+        'dst': np.array([d['dst'] for d in demands], dtype=np.int32),
+        'bandwidth_needed': np.array([d['bandwidth_needed'] for d in demands], dtype=np.float32),
+    })
+
+
 class NetworkManager:
     def __init__(self):
         self.graph = None
         self.demands = []
+        # Taleplerin sütun tabanlı kopyası (bkz. _demands_frame)
+        self.demands_df = _demands_frame([])
+        # Grafın dizi tabanlı görünümü (graf her yüklendiğinde yeniden kurulur)
+        self.index = None
 
     def load_from_csv(self, node_file, edge_file, demand_file=None):
         """
         Hocanın verdiği CSV dosyalarını (noktalı virgül ve virgül ondalık formatlı) okur.
         """
         print(f"--- MOD: Dosyadan Yükleme ---")
+
+        # Aynı dosyalar daha önce yüklendiyse tekrar ayrıştırma
+        try:
+            cache_key = _csv_cache_key(node_file, edge_file, demand_file)
+        except OSError:
+            cache_key = None
+        if cache_key in _csv_cache:
+            graph, demands, demands_df, self.index = _csv_cache[cache_key]
+            self.graph = graph.copy()
+            self.demands = [dict(d) for d in demands]
+            self.demands_df = demands_df.copy()
+            print(f"Önbellekten yüklendi. Node: {len(self.graph.nodes)}, Edge: {len(self.graph.edges)}, Talep: {len(self.demands)}")
+            return self.graph, self.demands
+
         self.graph = nx.Graph()
 
         # 1. Düğümleri (Nodes) Yükle
         # Beklenen Sütunlar: node_id, s_ms, r_node
+        # Ondalık ayırıcı virgül: decimal=',' ile doğrudan sayı olarak okunur
         try:
-            df_nodes = pd.read_csv(node_file, sep=';', dtype=str) # String okuyoruz ki virgülleri düzeltelim
-            for _, row in df_nodes.iterrows():
-                node_id = int(row['node_id'])
-                # Virgülleri noktaya çevirip float yapıyoruz
-                s_ms = float(row['s_ms'].replace(',', '.'))
-                r_node = float(row['r_node'].replace(',', '.'))
-                
-                self.graph.add_node(node_id, processing_time=s_ms, reliability=r_node)
+            df_nodes = pd.read_csv(
+                node_file, sep=';', decimal=',', float_precision='round_trip',
+                usecols=['node_id', 's_ms', 'r_node'],
+                dtype={'node_id': 'int64', 's_ms': 'float64', 'r_node': 'float64'}
+            )
+            self.graph.add_nodes_from(
+                (node_id, {'processing_time': s_ms, 'reliability': r_node})
+                for node_id, s_ms, r_node in zip(
+                    df_nodes['node_id'].tolist(),
+                    df_nodes['s_ms'].tolist(),
+                    df_nodes['r_node'].tolist()
+                )
+            )
                 
         except Exception as e:
             print(f"HATA (Node Dosyası): {e}")
@@ -34,16 +88,22 @@ class NetworkManager:
         # 2. Kenarları (Edges) Yükle
         # Beklenen Sütunlar: src, dst, capacity_mbps, delay_ms, r_link
         try:
-            df_edges = pd.read_csv(edge_file, sep=';', dtype=str)
-            for _, row in df_edges.iterrows():
-                src = int(row['src'])
-                dst = int(row['dst'])
-                cap = int(row['capacity_mbps'])
-                delay = int(row['delay_ms'])
-                # Güvenilirlik ondalık sayı (0,99 gibi)
-                r_link = float(row['r_link'].replace(',', '.'))
-                
-                self.graph.add_edge(src, dst, bandwidth=cap, delay=delay, reliability=r_link)
+            df_edges = pd.read_csv(
+                edge_file, sep=';', decimal=',', float_precision='round_trip',
+                usecols=['src', 'dst', 'capacity_mbps', 'delay_ms', 'r_link'],
+                dtype={'src': 'int64', 'dst': 'int64', 'capacity_mbps': 'int64',
+                       'delay_ms': 'int64', 'r_link': 'float64'}  # r_link: 0,99 gibi
+            )
+            self.graph.add_edges_from(
+                (src, dst, {'bandwidth': cap, 'delay': delay, 'reliability': r_link})
+                for src, dst, cap, delay, r_link in zip(
+                    df_edges['src'].tolist(),
+                    df_edges['dst'].tolist(),
+                    df_edges['capacity_mbps'].tolist(),
+                    df_edges['delay_ms'].tolist(),
+                    df_edges['r_link'].tolist()
+                )
+            )
                 
         except Exception as e:
             print(f"HATA (Edge Dosyası): {e}")
@@ -53,18 +113,30 @@ class NetworkManager:
         # Beklenen Sütunlar: src, dst, demand_mbps
         if demand_file:
             try:
-                df_demands = pd.read_csv(demand_file, sep=';')
-                self.demands = []
-                for i, row in df_demands.iterrows():
-                    self.demands.append({
-                        'id': i,
-                        'src': int(row['src']),
-                        'dst': int(row['dst']),
-                        'bandwidth_needed': int(row['demand_mbps'])
-                    })
+                df_demands = pd.read_csv(
+                    demand_file, sep=';',
+                    usecols=['src', 'dst', 'demand_mbps'],
+                    dtype={'src': 'int64', 'dst': 'int64', 'demand_mbps': 'int64'}
+                )
+                self.demands = [
+                    {'id': i, 'src': src, 'dst': dst, 'bandwidth_needed': bw}
+                    for i, (src, dst, bw) in enumerate(zip(
+                        df_demands['src'].tolist(),
+                        df_demands['dst'].tolist(),
+                        df_demands['demand_mbps'].tolist()
+                    ))
+                ]
             except Exception as e:
                 print(f"HATA (Demand Dosyası): {e}")
 
+        self.demands_df = _demands_frame(self.demands)
+        self.index = GraphIndex(self.graph)
+        if cache_key is not None:
+            _csv_cache[cache_key] = (
+                self.graph.copy(), [dict(d) for d in self.demands],
+                self.demands_df.copy(), self.index
+            )
+
         print(f"Başarılı! Node: {len(self.graph.nodes)}, Edge: {len(self.graph.edges)}, Talep: {len(self.demands)}")
         return self.graph, self.demands
 
@@ -106,6 +178,9 @@ class NetworkManager:
             except ValueError:
                 pass # Yeterli node yoksa atla
 
+        self.demands_df = _demands_frame(self.demands)
+        self.index = GraphIndex(self.graph)
+
         print(f"Rastgele ağ hazır. Node: {len(self.graph.nodes)}, Talep: {len(self.demands)}")
         return self.graph, self.demands
 
@@ -0,0 +1,136 @@
+"""
+Tek bir talebin seçilen algoritma ile çözülmesi.
+
+GUI'den bağımsızdır (Tk çağrısı yapmaz); böylece "Tüm Talepler"
+modunda talepler ayrı süreçlerde (ProcessPoolExecutor) çözülebilir.
+"""
+
+import time
+import networkx as nx
+
+# Algoritmalar her yerde src.algorithms adıyla yüklenir: aynı dosya iki farklı
+# modül adıyla yüklenirse Numba'nın disk önbelleği (dosya başına) iki ad
+# arasında paylaşılır ve çekirdek ısıtması da iki kez yapılır.
+from src.algorithms.ga import GenetikAlgorithm
+from src.algorithms.q_learning import QLearningRouter
+from src.algorithms.aco_optimizer import ACORouter
+from metrics import calculate_path_attributes, calculate_weighted_cost
+from graph_index import GraphIndex
+
+# İşçi süreç başına bir kez yüklenen ağ (bkz. init_worker)
+_worker_graph = None
+_worker_index = None
+
+
+def init_worker(graph):
+    """ProcessPoolExecutor initializer: grafı her işçiye bir kez yükler."""
+    global _worker_graph, _worker_index
+    _worker_graph = graph
+    _worker_index = GraphIndex(graph)
+
+
+def solve_demand_in_worker(demand, weights, algo):
+    """İşçi süreçte, init_worker ile yüklenen graf üzerinde talebi çözer."""
+    return solve_demand(_worker_graph, _worker_index, demand, weights, algo)
+
+
+def solve_demand(graph, index, demand, weights, algo):
+    """
+    Talebi verilen algoritma ile çözer.
+    Geriye {"demand", "metrics", "runtime"} sözlüğü döndürür.
+    """
+    d = demand
+    start_time = time.time()
+
+    # --- Q-LEARNING ---
+    if algo == "Q-Learning":
+        best_metrics = None
+        best_cost = float("inf")
+
+        for _ in range(5):
+            router = QLearningRouter(graph, weights, index=index)
+            router.train(d["src"], d["dst"], d["bandwidth_needed"])
+            path = router.get_best_path(d["src"], d["dst"])
+            metrics = router.get_path_metrics(path, d["bandwidth_needed"])
+
+            if metrics and metrics.get("valid", False):
+                if metrics["total_cost"] < best_cost:
+                    best_cost = metrics["total_cost"]
+                    best_metrics = metrics
+        metrics = best_metrics
+
+    # --- ACO (Ant Colony Optimization) ---
+    elif algo == "ACO":
+        best_metrics = None
+        best_cost = float("inf")
+
+        # Bağımsız yeniden başlatmalar: her biri taze feromonla yeni bir router
+        for _ in range(5):
+            router = ACORouter(graph, weights, ant_count=20, iterations=20, index=index)
+            router.train(d["src"], d["dst"], d["bandwidth_needed"])
+            path = router.get_best_path(d["src"], d["dst"])
+            if path and len(path) > 1:
+                metrics = router.get_path_metrics(path, d["bandwidth_needed"])
+
+                if metrics and metrics.get("valid", False):
+                    if metrics["total_cost"] < best_cost:
+                        best_cost = metrics["total_cost"]
+                        best_metrics = metrics
+
+        metrics = best_metrics
+
+    # --- GENETİK ---
+    elif algo == "Genetik":
+        best_metrics = None
+        best_cost = float("inf")
+
+        ga = GenetikAlgorithm()
+        for _ in range(1):
+            path = ga.genetik_calistir(graph, d["src"], d["dst"], d["bandwidth_needed"], weights)
+            if path and len(path) > 1:
+                metrics = ga.get_path_metrics(path, d["bandwidth_needed"])
+
+                if metrics and metrics.get("valid", False):
+                    if metrics["total_cost"] < best_cost:
+                        best_cost = metrics["total_cost"]
+                        best_metrics = metrics
+
+        metrics = best_metrics
+
+    # --- DIJKSTRA ---
+    else:
+        try:
+            # Dijkstra по умолчанию ищет кратчайший путь (по весу 1, т.е. хопам)
+            path = nx.shortest_path(graph, d["src"], d["dst"])
+            metrics = calculate_metrics_manual(graph, index, path, weights)
+        except nx.NetworkXNoPath:
+            metrics = None
+
+    return {
+        "demand": d,
+        "metrics": metrics,
+        "runtime": time.time() - start_time
+    }
+
+
+def calculate_metrics_manual(graph, index, path, weights):
+    attrs = calculate_path_attributes(graph, path)
+    cost = calculate_weighted_cost(attrs, weights)
+
+    eids = index.path_edge_ids(path)
+    path_arr = index.path_array(path)
+
+    total_reliability = float(
+        index.rel[eids].prod() * index.node_rel[path_arr].prod()
+    )
+    min_bw = float(index.bw[eids].min())
+
+    return {
+        "valid": True,
+        "path": path,
+        "total_delay": attrs["total_delay"],
+        "total_reliability": total_reliability,
+        "resource_cost": attrs["resource_cost"],
+        "total_cost": cost,
+        "bottleneck_bw": min_bw
+    }